@@ -82,12 +82,13 @@ const ScheduleGenerationScreen = ({
                       // BUT if we have scores for all blueprints, then nothing is "currently running"
                       const allBlueprintsHaveResults = Object.keys(progressData.blueprint_results).length === progressData.total_blueprints;
                       const allBlueprintsCompleted = allBlueprintsHaveResults && Object.values(progressData.blueprint_results).every(r => 
-                        r.score === 'infeasible' || typeof r.score === 'number'
+                        r.score === 'infeasible' || r.score === 'timeout' || typeof r.score === 'number'
                       );
                       
                       const isCurrentlyRunning = !allBlueprintsCompleted && 
                                                parseInt(blueprintNum) === progressData.current_blueprint && 
                                                result.score !== 'infeasible' && 
+                                               result.score !== 'timeout' && 
                                                typeof result.score !== 'number';
                       const isBest = result.score !== 'infeasible' && typeof result.score === 'number' && result.score === progressData.best_score;
                       return (
@@ -108,7 +109,7 @@ const ScheduleGenerationScreen = ({
                                    isCurrentlyRunning ? 'var(--text-secondary, #6b7280)' : 'var(--text-primary)',
                             fontWeight: isBest ? 'bold' : 'normal'
                           }}>
-                            {result.score === 'infeasible' ? 'Infeasible' : (isCurrentlyRunning ? 'Running...' : (typeof result.score === 'number' ? result.score.toFixed(2) : result.score))}
+                            {result.score === 'infeasible' ? 'Infeasible' : result.score === 'timeout' ? 'Timed out' : (isCurrentlyRunning ? 'Running...' : (typeof result.score === 'number' ? result.score.toFixed(2) : result.score))}
                           </span>
                           {isBest && (
                             <span style={{ 
@@ -160,7 +161,7 @@ const ScheduleGenerationScreen = ({
               if (progressData && progressData.blueprint_results) {
                 const blueprintCount = Object.keys(progressData.blueprint_results).length;
                 const hasRunningBlueprints = Object.values(progressData.blueprint_results).some(r => 
-                  r.score !== 'infeasible' && typeof r.score !== 'number'
+                  r.score !== 'infeasible' && r.score !== 'timeout' && typeof r.score !== 'number'
                 );
                 
                 if (hasRunningBlueprints) {
@@ -236,7 +237,7 @@ const ScheduleGenerationScreen = ({
                           color: result.score === 'infeasible' ? 'var(--warning, #f59e0b)' : 'var(--text-primary)',
                           fontWeight: isBest ? 'bold' : 'normal'
                         }}>
-                          {result.score === 'infeasible' ? 'Infeasible' : (typeof result.score === 'number' ? result.score.toFixed(2) : result.score)}
+                          {result.score === 'infeasible' ? 'Infeasible' : result.score === 'timeout' ? 'Timed out' : (typeof result.score === 'number' ? result.score.toFixed(2) : result.score)}
                         </span>
                         {isBest && (
                           <span style={{ 
@@ -7,14 +7,19 @@ Time -> Level -> Referee -> Team1 -> Score -> Team2
 # Configuration flags
 DATA_FILE = 'lobster_migrate/2324/2324_01.txt'
 SEASON_NAME = "USBF 2023-2024, Season 1"
-FORCE_CREATE_TEAMS = True  # If True, always create new teams. If False, use get_or_create
+FORCE_CREATE_TEAMS = True  # If True, always create new teams. If False, reuse existing teams by name
 YEAR_1 = 2023  # August-December dates
 YEAR_2 = 2024  # January-July dates
+VERBOSE = False  # If True, log every parsed week, off-week, game and court assignment
 
 import os
 import sys
 import django
-from datetime import datetime
+import functools
+import itertools
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
 import re
 
 # Add project root to Python path
@@ -23,28 +28,76 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'league_manager.settings')
 django.setup()
 
+from django.db import transaction
 from scheduler.models import Season, Level, TeamOrganization, SeasonTeam, Week, OffWeek, Game
 
+logger = logging.getLogger(__name__)
+
+# Patterns used on every line of the schedule section
+WEEK_RE = re.compile(r'Week (\d+)')
+SCORE_RE = re.compile(r'(\d+)\s*:\s*(\d+)')
+
+VALID_LEVELS = frozenset({'Top', 'High', 'Mid'})
+
+# Date lines start with the weekday, e.g. "Monday, September 11"
+DAYS = ('Monday, ', 'Tuesday, ', 'Wednesday, ', 'Thursday, ', 'Friday, ', 'Saturday, ', 'Sunday, ')
+
+# Courts used by the games of one time slot: 1 game = Court 3, 2 games = Court 2,3, 3 games = Court 1,2,3
+COURTS_BY_GAME_COUNT = {
+    1: ['Court 3'],
+    2: ['Court 2', 'Court 3'],
+    3: ['Court 1', 'Court 2', 'Court 3'],
+}
+
+
+def get_court(num_games, index):
+    """Court for the index-th game of a time slot holding num_games games"""
+    courts = COURTS_BY_GAME_COUNT.get(num_games)
+    if courts:
+        return courts[index]
+    # Fallback for more than 3 games
+    return f'Court {(index % 3) + 1}'
+
+
+# Schedules reuse a handful of game times and dates, so parsed values are
+# cached instead of calling strptime for every game
+@functools.lru_cache(maxsize=None)
+def parse_time(time_str):
+    return datetime.strptime(time_str, '%H:%M').time()
+
+
+@functools.lru_cache(maxsize=None)
+def parse_date(date_str, year):
+    return datetime.strptime(f"{date_str} {year}", "%B %d %Y").date()
+
 
 def parse_schedule_simple(filename):
     """Parse following exact format: time, level, ref, team1, score, team2"""
     
     with open(filename, 'r', encoding='utf-8') as f:
-        lines = [line.strip() for line in f.readlines()]
+        text = f.read()
+    # Exports carry stray whitespace around team names and scores, so every line is stripped
+    lines = [line.strip() for line in text.splitlines()]
     
-    # Skip to schedule section (after standings)
+    # Skip to schedule section (after standings): the first "Week 1" after line 40.
+    # Search the raw text and convert the hit back to a line index.
     start_idx = 0
-    for i, line in enumerate(lines):
-        if 'Week 1' in line and i > 40:
-            start_idx = i
+    line_start = 0
+    for _ in range(41):
+        line_start = text.find('\n', line_start) + 1
+        if not line_start:
             break
+    if line_start:
+        week_1_pos = text.find('Week 1', line_start)
+        if week_1_pos != -1:
+            start_idx = text.count('\n', 0, week_1_pos)
     
     # Extract teams from standings first
     teams_by_level = {}
     current_level = None
     
     for i, line in enumerate(lines[:start_idx]):
-        if line in ['Top', 'High', 'Mid']:
+        if line in VALID_LEVELS:
             current_level = line
             teams_by_level[current_level] = []
             continue
@@ -71,17 +124,17 @@ def parse_schedule_simple(filename):
         
         # Week header - skip duplicate week headers after dates
         if line.startswith('Week '):
-            week_num = int(re.search(r'Week (\d+)', line).group(1))
+            week_num = int(WEEK_RE.search(line).group(1))
             # Only process if this is a new week (not a duplicate after date)
             if current_week != week_num + off_week_count:
                 # Real week number = file week number + off-weeks encountered so far
                 current_week = week_num + off_week_count
-                print(f"Week {week_num} -> Week {current_week} (after {off_week_count} off-weeks)")
+                logger.debug("Week %d -> Week %d (after %d off-weeks)", week_num, current_week, off_week_count)
             i += 1
             continue
             
         # Date
-        if re.match(r'(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday), ', line):
+        if line.startswith(DAYS):
             date_str = line.split(', ')[1]
             # Extract month to determine year
             month = date_str.split()[0]
@@ -91,7 +144,7 @@ def parse_schedule_simple(filename):
                 year = YEAR_2
             else:
                 year = YEAR_1  # Default fallback
-            current_date = datetime.strptime(f"{date_str} {year}", "%B %d %Y").date()
+            current_date = parse_date(date_str, year)
             i += 1
             continue
             
@@ -104,58 +157,55 @@ def parse_schedule_simple(filename):
         if line == 'Off-Week':
             if current_date:
                 # Off weeks should be sequential weeks after the current date
-                from datetime import timedelta
                 off_week_date = current_date + timedelta(days=7)
                 off_weeks.append({'week': None, 'date': off_week_date})
                 off_week_count += 1
-                print(f"Found off-week #{off_week_count} on {off_week_date}")
+                logger.debug("Found off-week #%d on %s", off_week_count, off_week_date)
                 
                 # Check for consecutive Off-Week lines
                 j = i + 1
-                while j < len(lines) and lines[j].strip() == 'Off-Week':
+                while j < len(lines) and lines[j] == 'Off-Week':
                     off_week_date = off_week_date + timedelta(days=7)
                     off_weeks.append({'week': None, 'date': off_week_date})
                     off_week_count += 1
-                    print(f"Found off-week #{off_week_count} on {off_week_date}")
+                    logger.debug("Found off-week #%d on %s", off_week_count, off_week_date)
                     j += 1
                 i = j - 1  # Set i to the last Off-Week line processed
             i += 1
             continue
             
-        # Time (start of game)
-        if re.match(r'\d{2}:\d{2}', line) and i + 4 < len(lines):
+        # Time (start of game), e.g. "19:20"
+        if (len(line) >= 5 and line[2] == ':' and line[:2].isdigit() and line[3:5].isdigit()
+                and i + 4 < len(lines)):
             time_str = line
-            level = lines[i + 1]
+            # Up to six lines following the time; the guard above ensures at least four
+            l1, l2, l3, l4, *rest = lines[i + 1:i + 7]
+            level = l1
             
             # Check if next line is a score (no referee case)
-            if re.search(r'\d+\s*:\s*\d+', lines[i + 3]):
+            if SCORE_RE.search(l3):
                 # Format: Time -> Level -> Team1 -> Score -> Team2
                 referee = ""
-                team1 = lines[i + 2]
-                score_line = lines[i + 3]
-                team2 = lines[i + 4] if i + 4 < len(lines) else ""
+                team1, score_line, team2 = l2, l3, l4
                 skip_lines = 5
             else:
                 # Format: Time -> Level -> Referee -> [Match menu] -> Team1 -> Score -> Team2
-                if i + 6 >= len(lines):
+                if len(rest) < 2:
                     i += 1
                     continue
-                referee = lines[i + 2]
+                l5, l6 = rest
+                referee = l2
                 # Skip "Match menu" if present
-                if lines[i + 3] == "Match menu":
-                    team1 = lines[i + 4]
-                    score_line = lines[i + 5]
-                    team2 = lines[i + 6]
+                if l3 == "Match menu":
+                    team1, score_line, team2 = l4, l5, l6
                     skip_lines = 7
                 else:
-                    team1 = lines[i + 3]
-                    score_line = lines[i + 4]
-                    team2 = lines[i + 5]
+                    team1, score_line, team2 = l3, l4, l5
                     skip_lines = 6
             
             # Parse score - ignore trailing single digits
-            score_match = re.search(r'(\d+)\s*:\s*(\d+)', score_line)
-            if score_match and level in ['Top', 'High', 'Mid'] and team1 and team2:
+            score_match = SCORE_RE.search(score_line)
+            if score_match and level in VALID_LEVELS and team1 and team2:
                 team1_score = int(score_match.group(1))
                 team2_score = int(score_match.group(2))
                 
@@ -170,8 +220,10 @@ def parse_schedule_simple(filename):
                     'team1_score': team1_score,
                     'team2_score': team2_score
                 })
-                ref_str = f"ref:{referee}" if referee else "no ref"
-                print(f"Game {len(games)}: {time_str} {level} {team1} vs {team2} ({team1_score}-{team2_score}) {ref_str}")
+                logger.debug(
+                    "Game %d: %s %s %s vs %s (%d-%d) %s", len(games), time_str, level, team1, team2,
+                    team1_score, team2_score, f"ref:{referee}" if referee else "no ref"
+                )
             else:
                 print(f"FAILED to parse game at line {i}: time={time_str} level={level} team1={team1} score={score_line} team2={team2}")
             
@@ -184,6 +236,7 @@ def parse_schedule_simple(filename):
     return teams_by_level, games, off_weeks
 
 
+@transaction.atomic
 def import_data(filename):
     teams_by_level, games, off_weeks = parse_schedule_simple(filename)
     
@@ -220,100 +273,79 @@ def import_data(filename):
         levels[level_name] = level
     
     # Create teams and season teams
-    all_teams = set()
-    for level_teams in teams_by_level.values():
-        all_teams.update(level_teams)
+    team_orgs = {}
+    if not FORCE_CREATE_TEAMS:
+        # Reuse existing teams (the oldest one if a name is shared)
+        all_team_names = list(itertools.chain.from_iterable(teams_by_level.values()))
+        for team_org in TeamOrganization.objects.filter(name__in=all_team_names).order_by('pk'):
+            team_orgs.setdefault(team_org.name, team_org)
+    # Create every team that wasn't reused - all of them when FORCE_CREATE_TEAMS is set
+    created_orgs = TeamOrganization.objects.bulk_create([
+        TeamOrganization(name=team_name, is_archived=False, is_deleted=False)
+        for team_names in teams_by_level.values()
+        for team_name in team_names
+        if team_name not in team_orgs
+    ])
+    team_orgs.update((team_org.name, team_org) for team_org in created_orgs)
     
-    season_teams = {}
-    for team_name in all_teams:
-        # Find level
-        team_level = None
-        for level_name, team_names in teams_by_level.items():
-            if team_name in team_names:
-                team_level = level_name
-                break
-        
-        if team_level:
-            if FORCE_CREATE_TEAMS:
-                # Always create new teams
-                team_org = TeamOrganization.objects.create(
-                    name=team_name,
-                    is_archived=False,
-                    is_deleted=False
-                )
-            else:
-                # Use get_or_create (reuse existing teams)
-                team_org, created = TeamOrganization.objects.get_or_create(
-                    name=team_name,
-                    defaults={'is_archived': False, 'is_deleted': False}
-                )
-            season_team, created = SeasonTeam.objects.get_or_create(
-                season=season, team=team_org,
-                defaults={'level': levels[team_level]}
-            )
-            season_teams[team_name] = season_team
+    SeasonTeam.objects.bulk_create([
+        SeasonTeam(season=season, team=team_orgs[team_name], level=levels[level_name])
+        for level_name, team_names in teams_by_level.items()
+        for team_name in team_names
+    ])
+    season_teams = {
+        season_team.team.name: season_team
+        for season_team in SeasonTeam.objects.filter(season=season).select_related('team')
+    }
     
-    # Create weeks
-    weeks = {}
+    # Create weeks, dated by the first game parsed for each week
+    week_dates = {}
     for game in games:
-        if game['week'] not in weeks:
-            week, created = Week.objects.get_or_create(
-                season=season,
-                week_number=game['week'],
-                defaults={'monday_date': game['date']}
-            )
-            weeks[game['week']] = week
+        week_dates.setdefault(game['week'], game['date'])
+    Week.objects.bulk_create([
+        Week(season=season, week_number=week_number, monday_date=monday_date)
+        for week_number, monday_date in week_dates.items()
+    ])
+    weeks = {week.week_number: week for week in Week.objects.filter(season=season)}
     
     # Create off weeks
-    for off_week_data in off_weeks:
-        OffWeek.objects.get_or_create(
+    OffWeek.objects.bulk_create([
+        OffWeek(
             season=season,
             monday_date=off_week_data['date'],
-            defaults={'title': 'Off Week', 'description': 'No games scheduled'}
+            title='Off Week',
+            description='No games scheduled'
         )
+        for off_week_data in off_weeks
+    ], ignore_conflicts=True)
     
-    # Assign courts based on time slots
-    # Group games by week, date, and time
-    from collections import defaultdict
-    time_slots = defaultdict(list)
-    
-    for game_data in games:
-        if (game_data['team1'] in season_teams and 
-            game_data['team2'] in season_teams):
-            key = (game_data['week'], game_data['date'], game_data['time'])
-            time_slots[key].append(game_data)
-    
-    # Assign courts: 1 game = Court 3, 2 games = Court 2,3, 3 games = Court 1,2,3
-    for time_slot_games in time_slots.values():
-        num_games = len(time_slot_games)
-        if num_games == 1:
-            time_slot_games[0]['court'] = 'Court 3'
-        elif num_games == 2:
-            time_slot_games[0]['court'] = 'Court 2'
-            time_slot_games[1]['court'] = 'Court 3'
-        elif num_games == 3:
-            time_slot_games[0]['court'] = 'Court 1'
-            time_slot_games[1]['court'] = 'Court 2'
-            time_slot_games[2]['court'] = 'Court 3'
-        else:
-            # Fallback for more than 3 games
-            for i, game in enumerate(time_slot_games):
-                court_num = (i % 3) + 1
-                game['court'] = f'Court {court_num}'
+    # Count games per time slot (week, date, time) so courts can be assigned in one pass
+    slot_sizes = Counter(
+        (game_data['week'], game_data['date'], game_data['time'])
+        for game_data in games
+        if game_data['team1'] in season_teams and game_data['team2'] in season_teams
+    )
     
-    print(f"Court assignments:")
-    for key, slot_games in time_slots.items():
-        week, date, time = key
-        print(f"  Week {week} {time}: {len(slot_games)} games - {[g['court'] for g in slot_games]}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Court assignments:")
+        for (week, date, time), num_games in slot_sizes.items():
+            courts = [get_court(num_games, i) for i in range(num_games)]
+            logger.debug("  Week %s %s: %d games - %s", week, time, num_games, courts)
     
     # Create games with court assignments
-    games_created = 0
+    seen_games = set()
+    games_to_create = []
+    slot_indices = Counter()
     for game_data in games:
         if (game_data['team1'] in season_teams and 
             game_data['team2'] in season_teams):
             
+            slot_key = (game_data['week'], game_data['date'], game_data['time'])
+            court = get_court(slot_sizes[slot_key], slot_indices[slot_key])
+            slot_indices[slot_key] += 1
+            
             try:
-                time_obj = datetime.strptime(game_data['time'], '%H:%M').time()
+                time_obj = parse_time(game_data['time'])
             except:
                 continue
                 
@@ -322,32 +354,35 @@ def import_data(filename):
             if game_data['referee'] in season_teams:
                 referee_season_team = season_teams[game_data['referee']]
             
-            game, created = Game.objects.get_or_create(
+            game = Game(
                 level=levels[game_data['level']],
                 week=weeks[game_data['week']],
                 season_team1=season_teams[game_data['team1']],
                 season_team2=season_teams[game_data['team2']],
-                defaults={
-                    'time': time_obj,
-                    'day_of_week': 0,  # Monday
-                    'team1_score': game_data['team1_score'],
-                    'team2_score': game_data['team2_score'],
-                    'referee_season_team': referee_season_team,
-                    'court': game_data.get('court', 'Court 1'),
-                }
+                time=time_obj,
+                day_of_week=0,  # Monday
+                team1_score=game_data['team1_score'],
+                team2_score=game_data['team2_score'],
+                referee_season_team=referee_season_team,
+                court=court,
             )
-            
-            if created:
-                games_created += 1
+            # Skip games that repeat earlier in the file
+            key = (game.level_id, game.week_id, game.season_team1_id, game.season_team2_id)
+            if key not in seen_games:
+                seen_games.add(key)
+                games_to_create.append(game)
+    
+    Game.objects.bulk_create(games_to_create, batch_size=500)
+    games_created = len(games_to_create)
     
     print(f"Import complete: {games_created} games created")
     
-    # Verify game counts
-    from collections import defaultdict
-    team_games = defaultdict(int)
-    for game in Game.objects.filter(level__season=season):
-        team_games[game.get_team1_name()] += 1
-        team_games[game.get_team2_name()] += 1
+    # Verify game counts (team names are joined in by the same query)
+    team_games = Counter(itertools.chain.from_iterable(
+        Game.objects.filter(level__season=season).values_list(
+            'season_team1__team__name', 'season_team2__team__name'
+        )
+    ))
     
     print("\nGame counts:")
     for team, count in sorted(team_games.items()):
@@ -356,4 +391,5 @@ def import_data(filename):
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG if VERBOSE else logging.INFO, format='%(message)s', stream=sys.stdout)
     import_data(DATA_FILE)
\ No newline at end of file
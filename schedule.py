@@ -1,106 +1,373 @@
 import pulp
+import concurrent.futures
+import functools
 import itertools
+import math
+import os
+import random
+import signal
 from collections import defaultdict
-import orloge
 
 from tests import adjacent_slot_test, cycle_pairing_test, global_slot_distribution_test, pairing_tests, referee_player_test
 from stats import print_statistics
 
+class TrackedCBC(pulp.PULP_CBC_CMD):
+    """
+    PULP_CBC_CMD that remembers the temporary files of its current solve, so
+    the CBC process working on them can be found and killed without touching
+    any other CBC process on the machine.
+    """
+    tmp_files = ()
+
+    def create_tmp_files(self, name, *args):
+        self.tmp_files = tuple(super().create_tmp_files(name, *args))
+        return self.tmp_files
+
+    def _for_each_process(self, action):
+        import psutil
+        for child in psutil.Process().children(recursive=True):
+            try:
+                if any(path in child.cmdline() for path in self.tmp_files):
+                    action(child)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+    def kill(self):
+        """Kills the CBC process of the current solve, if it is still running."""
+        self._for_each_process(lambda process: process.kill())
+
+    def interrupt(self):
+        """
+        Asks the CBC process of the current solve to stop. CBC handles SIGINT
+        by finishing with the best solution it has found, which PuLP then
+        reads back as usual.
+        """
+        self._for_each_process(lambda process: process.send_signal(signal.SIGINT))
+
+class TrackedHiGHS(pulp.HiGHS):
+    """
+    HiGHS solver that keeps hold of its in-process model so a solve running
+    on another thread can be interrupted, the counterpart of TrackedCBC.kill.
+    """
+    highs = None
+
+    def createAndConfigureSolver(self, lp):
+        super().createAndConfigureSolver(lp)
+        lp.solverModel.HandleUserInterrupt = True
+        self.highs = lp.solverModel
+
+    def kill(self):
+        """Asks the current solve to stop at HiGHS' next interrupt check."""
+        if self.highs is not None:
+            self.highs.cancelSolve()
+
+    # An interrupted HiGHS solve keeps the best solution it has found
+    interrupt = kill
+
+# Score phase_2_assign_slots_and_refs returns when the solver overran its time
+# limit and had to be killed, so nothing is known about the blueprint
+TIMED_OUT = 'timeout'
+
+def read_cbc_best_bound(log_path):
+    """
+    Reads the best bound from the summary CBC prints at the end of its log:
+    the objective value when CBC stopped at an optimal solution (also within
+    the gap tolerance), otherwise the reported lower bound. Returns None if
+    the log has neither, e.g. when the problem was infeasible.
+    """
+    summary = {}
+    with open(log_path) as log:
+        for line in log:
+            key, sep, value = line.partition(':')
+            if line.startswith('Result - '):
+                summary['result'] = line
+            elif sep and key in ('Objective value', 'Lower bound'):
+                summary[key] = float(value)
+    if 'result' not in summary:
+        return None
+    if summary['result'].startswith('Result - Optimal'):
+        return summary.get('Objective value')
+    return summary.get('Lower bound')
+
+@functools.lru_cache(maxsize=None)
 def get_round_robin_length(num_teams):
     """Calculates the number of weeks for one full round-robin."""
     return num_teams - 1 if num_teams % 2 == 0 else num_teams
 
-def phase_1_generate_multiple_matchups(total_weeks, team_names_by_level, num_blueprints_to_find=5, verbose=False, cancellation_checker=None):
+def circle_method_rounds(teams):
+    """
+    Builds one full round-robin with the circle method: the first team stays
+    fixed and the rest rotate one position each round. Odd-sized levels get a
+    bye (None) that is dropped from the returned pairs.
+    """
+    teams = list(teams)
+    if len(teams) % 2 == 1:
+        teams.append(None)
+    n = len(teams)
+    rounds = []
+    for _ in range(n - 1):
+        pairs = [tuple(sorted((teams[i], teams[n - 1 - i]))) for i in range(n // 2)
+                 if teams[i] is not None and teams[n - 1 - i] is not None]
+        rounds.append(pairs)
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return rounds
+
+def blueprint_signature(blueprint, team_names_by_level):
+    """
+    Returns a key that is the same for blueprints that only differ by how the
+    teams within each level are named. Phase 1 uses it to prefer genuinely
+    different blueprints, and only solves such renamings when nothing else
+    is left.
+
+    Each level's teams are relabelled starting from every team in turn:
+    working through the weeks, the opponents of already labelled teams get
+    the next labels. The smallest relabelled season over all starting teams
+    is the level's part of the key.
+    """
+    team_to_level = {team: lvl for lvl, teams in team_names_by_level.items() for team in teams}
+    weeks_by_level = {level: [] for level in team_names_by_level}
+    for week in blueprint:
+        opponents_by_level = {level: {} for level in team_names_by_level}
+        for t1, t2 in week['games']:
+            opponents = opponents_by_level[team_to_level[t1]]
+            opponents[t1], opponents[t2] = t2, t1
+        for level, opponents in opponents_by_level.items():
+            weeks_by_level[level].append(opponents)
+
+    signature = []
+    for level, teams in team_names_by_level.items():
+        weeks = weeks_by_level[level]
+        best = None
+        for anchor in teams:
+            labels = {anchor: 0}
+            ordered = [anchor]
+            added = True
+            while added and len(labels) < len(teams):
+                added = False
+                for opponents in weeks:
+                    for team in ordered:
+                        opponent = opponents.get(team)
+                        if opponent is not None and opponent not in labels:
+                            labels[opponent] = len(ordered)
+                            ordered.append(opponent)
+                            added = True
+            # Teams that never meet the anchor's group keep their name order
+            for team in sorted(teams):
+                if team not in labels:
+                    labels[team] = len(ordered)
+                    ordered.append(team)
+            relabelled = tuple(tuple(sorted(tuple(sorted((labels[t1], labels[t2])))
+                                            for t1, t2 in opponents.items() if t1 < t2))
+                               for opponents in weeks)
+            if best is None or relabelled < best:
+                best = relabelled
+        signature.append(best)
+    return tuple(signature)
+
+def phase_1_generate_matchups_circle(total_weeks, team_names_by_level, num_blueprints_to_find=5, cancellation_checker=None):
+    """
+    Builds weekly matchups directly with the circle method instead of solving
+    an ILP. Each level's round-robin is repeated every rr_len weeks, which is
+    exactly what the cycle pairing constraint asks for. Different blueprints
+    come from shuffling the order of the rounds within each level (the first
+    blueprint keeps the natural order).
+    """
+    rounds_by_level = {level: circle_method_rounds(teams)
+                       for level, teams in team_names_by_level.items() if len(teams) >= 2}
+
+    found_blueprints = []
+    relabelled_blueprints = []
+    seen = set()
+    signatures = set()
+    # Small levels have only a handful of round orders, so give up after a
+    # bounded number of attempts rather than looping forever on duplicates.
+    for attempt in range(num_blueprints_to_find * 20):
+        if len(found_blueprints) >= num_blueprints_to_find:
+            break
+        if cancellation_checker and cancellation_checker():
+            print(f"\nBlueprint generation cancelled after {len(found_blueprints)} blueprints.")
+            break
+
+        rng = random.Random(attempt)
+        ordered_rounds = {}
+        for level, rounds in rounds_by_level.items():
+            order = list(range(len(rounds)))
+            if attempt > 0:
+                rng.shuffle(order)
+            ordered_rounds[level] = [rounds[r] for r in order]
+
+        blueprint = []
+        for w in range(total_weeks):
+            games = [pair for rounds in ordered_rounds.values() for pair in rounds[w % len(rounds)]]
+            blueprint.append({'week': w, 'games': games})
+
+        key = tuple(tuple(week['games']) for week in blueprint)
+        if key in seen:
+            continue
+        seen.add(key)
+        # Many round orders are just a relabelling of the teams of an earlier
+        # blueprint (every order is, for 6-team levels), so hold those back
+        # while genuinely different blueprints can still be found
+        signature = blueprint_signature(blueprint, team_names_by_level)
+        if signature in signatures:
+            relabelled_blueprints.append(blueprint)
+            continue
+        signatures.add(signature)
+        print(f"  Found blueprint #{len(found_blueprints)+1}...")
+        found_blueprints.append(blueprint)
+
+    # A relabelled blueprint poses the same Phase 2 problem, but CBC takes a
+    # different path through it and often ends at a different schedule, so it
+    # is still worth solving when nothing else is left
+    for blueprint in relabelled_blueprints[:num_blueprints_to_find - len(found_blueprints)]:
+        print(f"  Found blueprint #{len(found_blueprints)+1}...")
+        found_blueprints.append(blueprint)
+
+    if len(found_blueprints) < num_blueprints_to_find:
+        print(f"  No more unique blueprints found. Proceeding with {len(found_blueprints)} options.")
+    return found_blueprints
+
+def phase_1_generate_multiple_matchups(total_weeks, team_names_by_level, num_blueprints_to_find=5, verbose=False, cancellation_checker=None, use_ilp=False):
     """
     Solves for weekly matchups multiple times, finding a different valid
     blueprint each time. This provides multiple starting points for Phase 2.
+
+    By default the matchups are built with the circle method; set use_ilp=True
+    to fall back to the original ILP formulation.
     """
     print(f"\n--- Starting Phase 1: Generating up to {num_blueprints_to_find} unique matchup blueprints ---")
 
+    if not use_ilp:
+        return phase_1_generate_matchups_circle(total_weeks, team_names_by_level, num_blueprints_to_find, cancellation_checker=cancellation_checker)
+
     levels = list(team_names_by_level.keys())
-    all_teams = sorted([team for teams in team_names_by_level.values() for team in teams])
-    team_to_level = {team: lvl for lvl, teams in team_names_by_level.items() for team in teams}
     weeks_range = range(total_weeks)
     
-    all_possible_pairs = [tuple(sorted(p)) for lvl in levels for p in itertools.combinations(team_names_by_level[lvl], 2)]
+    pairs_by_level = {lvl: [tuple(sorted(p)) for p in itertools.combinations(team_names_by_level[lvl], 2)] for lvl in levels}
+    all_possible_pairs = [p for lvl in levels for p in pairs_by_level[lvl]]
+    pairs_of_team = {t: [p for p in pairs_by_level[lvl] if t in p] for lvl, teams in team_names_by_level.items() for t in teams}
 
     prob = pulp.LpProblem("MatchupScheduling_Multi", pulp.LpMinimize)
-    plays_in_week = pulp.LpVariable.dicts("PlaysInWeek", (all_possible_pairs, weeks_range), cat='Binary')
-    matchup_counts = pulp.LpVariable.dicts("MatchupCount", all_possible_pairs, cat='Integer')
-
+    # Cycle pairing means week w and week w + rr_len always hold the same
+    # games, so only the first round-robin gets variables and later weeks
+    # reuse them instead of being tied together with equality constraints.
+    plays_in_week = {}
+    cycle_variables = []
+    sym_break_names = []
     for level in levels:
         teams = team_names_by_level[level]
         num_teams = len(teams)
+        level_pairs = pairs_by_level[level]
+        rr_len = get_round_robin_length(num_teams)
+        cycle_range = range(min(rr_len, total_weeks))
+        for i, pair in enumerate(level_pairs):
+            cycle_vars = pulp.LpVariable.dicts(f"PlaysInWeek_{level}_{i}", cycle_range, cat='Binary')
+            plays_in_week[pair] = {w: cycle_vars[w % rr_len] for w in weeks_range}
+            cycle_variables.extend(cycle_vars.values())
         if num_teams < 2: continue
+
         total_level_games = (num_teams * total_weeks) // 2
-        level_pairs = [p for p in all_possible_pairs if p[0] in teams]
         min_plays = total_level_games // len(level_pairs)
+        # Bound each pair's meetings directly instead of through a separate count variable
         for pair in level_pairs:
-            matchup_counts[pair].lowBound = min_plays
-            matchup_counts[pair].upBound = min_plays + 1
-            prob += pulp.lpSum(plays_in_week[pair][w] for w in weeks_range) == matchup_counts[pair]
-        prob += pulp.lpSum(matchup_counts[pair] for pair in level_pairs) == total_level_games
-    for team in all_teams:
-        num_teams_in_level = len(team_names_by_level[team_to_level[team]])
-        for w in weeks_range:
-            games_in_week = pulp.lpSum(plays_in_week[p][w] for p in all_possible_pairs if team in p)
-            if num_teams_in_level % 2 == 0: prob += games_in_week == 1
-            else: prob += games_in_week <= 1
-    for level in levels:
-        teams = team_names_by_level[level]
-        num_teams = len(teams)
-        if num_teams < 2: continue
-        rr_len = get_round_robin_length(num_teams)
-        level_pairs = [p for p in all_possible_pairs if p[0] in teams]
-        for pair in level_pairs:
-            for w in range(total_weeks - rr_len):
-                prob += plays_in_week[pair][w] == plays_in_week[pair][w + rr_len]
+            pair_plays = pulp.lpSum(plays_in_week[pair][w] for w in weeks_range)
+            prob += pair_plays >= min_plays
+            prob += pair_plays <= min_plays + 1
+        prob += pulp.lpSum(plays_in_week[pair][w] for pair in level_pairs for w in weeks_range) == total_level_games
+        # Relabelling teams gives equivalent schedules, and any week-0 matching can
+        # be relabelled into pairing the level's teams in order (the last one
+        # sitting out in an odd level), so pin that rather than letting CBC
+        # explore every symmetric copy
+        if total_weeks > 0:
+            for i in range(num_teams // 2):
+                first_week_pair = tuple(sorted((teams[2 * i], teams[2 * i + 1])))
+                prob += plays_in_week[first_week_pair][0] == 1, f"SymBreak_{level}_{i}"
+                sym_break_names.append(f"SymBreak_{level}_{i}")
+
+        # Teams in an even level play every week, in an odd level one team sits out
+        plays_every_week = num_teams % 2 == 0
+        for team in teams:
+            team_pairs = pairs_of_team[team]
+            for w in weeks_range:
+                games_in_week = pulp.lpSum(plays_in_week[p][w] for p in team_pairs)
+                if plays_every_week: prob += games_in_week == 1
+                else: prob += games_in_week <= 1
 
     # --- The "Find Multiple Solutions" Logic ---
-    solver = pulp.PULP_CBC_CMD(msg=verbose)
+    # Each attempt minimises a different random weighting of the cycle variables,
+    # which steers CBC to a different blueprint without piling up no-good cuts
+    # that make every later solve harder. The previous solution is passed back
+    # as a warm start.
+    solver = pulp.PULP_CBC_CMD(msg=verbose, warmStart=True)
     found_blueprints = []
-    
-    for i in range(num_blueprints_to_find):
+    seen = set()
+    signatures = set()
+    relabelled_blueprints = []
+
+    max_attempts = num_blueprints_to_find * 20
+    for attempt in range(2 * max_attempts):
+        if len(found_blueprints) >= num_blueprints_to_find:
+            break
         # Check for cancellation before each blueprint
         if cancellation_checker and cancellation_checker():
             print(f"\nBlueprint generation cancelled after {len(found_blueprints)} blueprints.")
             break
-            
+        if attempt == max_attempts:
+            # With week 0 pinned, small levels have very few blueprints left (a
+            # 4-team level only has two orders of its other rounds), so top up
+            # with relabelled blueprints from solves without the pinning
+            if len(found_blueprints) + len(relabelled_blueprints) >= num_blueprints_to_find or not sym_break_names:
+                break
+            for name in sym_break_names:
+                del prob.constraints[name]
+
+        rng = random.Random(attempt)
+        prob.setObjective(pulp.lpSum(rng.random() * v for v in cycle_variables))
         prob.solve(solver)
-        
-        if pulp.LpStatus[prob.status] == "Optimal":
-            print(f"  Found blueprint #{i+1}...")
-            # Store the found solution
-            blueprint = []
-            on_variables = []
-            for w in weeks_range:
-                games = []
-                for pair in all_possible_pairs:
-                    if plays_in_week[pair][w].varValue > 0.5:
-                        games.append(pair)
-                        on_variables.append(plays_in_week[pair][w])
-                blueprint.append({'week': w, 'games': games})
-            found_blueprints.append(blueprint)
-            
-            # Add a "no-good" cut: a constraint that forbids this exact solution from being found again.
-            # It says "the sum of all variables that were 'on' in this solution must be less than the total number of them".
-            prob += pulp.lpSum(on_variables) <= len(on_variables) - 1, f"No_Good_Cut_{i}"
-        else:
-            # If the solver can't find another optimal solution, we've found all possible blueprints.
-            print(f"  No more unique blueprints found. Proceeding with {len(found_blueprints)} options.")
+
+        if pulp.LpStatus[prob.status] != "Optimal":
+            # The constraints themselves are infeasible, another objective won't help
             break
-            
+
+        # Store the found solution
+        blueprint = []
+        for w in weeks_range:
+            games = [pair for pair in all_possible_pairs if plays_in_week[pair][w].varValue > 0.5]
+            blueprint.append({'week': w, 'games': games})
+        key = tuple(tuple(week['games']) for week in blueprint)
+        if key in seen:
+            continue
+        seen.add(key)
+        # Pinning week 0 leaves the other weeks free to be relabelled, so a new
+        # objective can still land on an earlier blueprint in disguise
+        signature = blueprint_signature(blueprint, team_names_by_level)
+        if signature in signatures:
+            relabelled_blueprints.append(blueprint)
+            continue
+        signatures.add(signature)
+        found_blueprints.append(blueprint)
+        print(f"  Found blueprint #{len(found_blueprints)}...")
+
+    for blueprint in relabelled_blueprints[:num_blueprints_to_find - len(found_blueprints)]:
+        found_blueprints.append(blueprint)
+        print(f"  Found blueprint #{len(found_blueprints)}...")
+
+    if len(found_blueprints) < num_blueprints_to_find:
+        print(f"  No more unique blueprints found. Proceeding with {len(found_blueprints)} options.")
     return found_blueprints
 
-def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_level, weekly_matchups, time_limit: float, gapRel: float, cancellation_checker=None, use_best_checker=None):
+def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_level, weekly_matchups, time_limit: float, gapRel: float, cancellation_checker=None, use_best_checker=None, threads=None, solver="cbc"):
     """
     Takes a fixed weekly matchup schedule and assigns slots and referees.
     This phase contains the optimization objectives.
-    NOW RETURNS the schedule AND its objective score.
+    NOW RETURNS the schedule AND its objective score. The score is TIMED_OUT
+    when the solver overran its time limit without a schedule.
     
     Args:
         cancellation_checker: Optional function that returns True if generation should be cancelled
         use_best_checker: Optional function that returns True if generation should stop and use best found
+        threads: Number of threads the solver may use (solver default when None)
+        solver: "cbc" or "highs"; HiGHS needs the optional highspy package and falls back to CBC without it
     """
     # --- Setup ---
     num_slots = len(courts_per_slot)
@@ -109,61 +376,97 @@ def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_le
     weeks_range = range(total_weeks)
     slots_range = range(1, num_slots + 1)
     all_games = [(g, w_data['week']) for w_data in weekly_matchups for g in w_data['games']]
+    games_by_week = defaultdict(list)
+    for g, (_, week) in enumerate(all_games):
+        games_by_week[week].append(g)
+    # Teams are identified by their position in all_teams while building the
+    # model; names are only needed for variable names and the final output.
+    team_id = {team: i for i, team in enumerate(all_teams)}
+    teams_range = range(len(all_teams))
+    game_teams = [(team_id[t1], team_id[t2]) for (t1, t2), _ in all_games]
+    # Level and eligible referees of each game, looked up again when adding the
+    # referee constraints and when reading the solution back
+    game_meta = [(team_to_level[t1], tuple(team_id[t] for t in team_names_by_level[team_to_level[t1]] if t != t1 and t != t2))
+                 for (t1, t2), _ in all_games]
     prob = pulp.LpProblem("SlotAndRefAssignment", pulp.LpMinimize)
-    game_in_slot = pulp.LpVariable.dicts("GameInSlot", (all_games, slots_range), cat='Binary')
+    # Games are referred to by their index in all_games; keying variables on
+    # ((t1, t2), week) tuples meant hashing nested string tuples everywhere and
+    # produced very long variable names.
+    game_in_slot = pulp.LpVariable.dicts("GameInSlot", (range(len(all_games)), slots_range), cat='Binary')
     refs = {}
-    is_reffing = defaultdict(lambda: pulp.LpAffineExpression())
-    for game, week in all_games:
-        t1, t2 = game
-        level = team_to_level[t1]
-        possible_refs = [t for t in team_names_by_level[level] if t != t1 and t != t2]
+    # Collect the variables behind each (team, week, slot) as plain lists and
+    # only turn them into expressions where a constraint needs them; growing
+    # LpAffineExpressions one term at a time is much slower.
+    ref_terms = defaultdict(list)
+    # A game can only be refereed in a slot that has courts that week and an
+    # adjacent slot with courts for the referee to play in, so other slots get
+    # no referee variables at all
+    ref_slots_by_week = [[s for s in slots_range if courts_per_slot[s][w] > 0 and
+                          any(courts_per_slot.get(adj, [0] * total_weeks)[w] > 0 for adj in (s - 1, s + 1))]
+                         for w in weeks_range]
+    for g, (_, week) in enumerate(all_games):
+        _, possible_refs = game_meta[g]
+        ref_slots = ref_slots_by_week[week]
         for t_ref in possible_refs:
-            ref_vars = pulp.LpVariable.dicts(f"Ref_{t_ref}_{t1}_{t2}_{week}", slots_range, cat='Binary')
-            refs[(t_ref, game, week)] = ref_vars
-            for s in slots_range:
-                is_reffing[(t_ref, week, s)] += ref_vars[s]
-    is_playing = defaultdict(lambda: pulp.LpAffineExpression())
-    for (t1, t2), w in all_games:
+            # Short index-based names: formatting team names into thousands of
+            # variable names is a noticeable part of building the model
+            ref_vars = pulp.LpVariable.dicts(f"Ref_{g}_{t_ref}", ref_slots, cat='Binary')
+            refs[(t_ref, g)] = ref_vars
+            for s in ref_slots:
+                ref_terms[(t_ref, week, s)].append(ref_vars[s])
+    play_terms = defaultdict(list)
+    for g, (t1, t2) in enumerate(game_teams):
+        w = all_games[g][1]
         for s in slots_range:
-            var = game_in_slot[(t1, t2), w][s]
-            is_playing[(t1, w, s)] += var
-            is_playing[(t2, w, s)] += var
-    for game, week in all_games:
-        prob += pulp.lpSum(game_in_slot[game, week][s] for s in slots_range) == 1
-    for w in weeks_range:
-        games_this_week = [g for g, week in all_games if week == w]
-        for s in slots_range:
-            prob += pulp.lpSum(game_in_slot[g, w][s] for g in games_this_week) <= courts_per_slot[s][w]
-    for (t1, t2), w in all_games:
-        level = team_to_level[t1]
-        possible_refs = [t for t in team_names_by_level[level] if t != t1 and t != t2]
+            var = game_in_slot[g][s]
+            play_terms[(t1, w, s)].append(var)
+            play_terms[(t2, w, s)].append(var)
+    # Season-long games per team and slot, shared by the slot balance objective
+    # and the first/last slot limits
+    team_slot_plays = {(t, s): pulp.lpSum(v for w in weeks_range for v in play_terms[(t, w, s)])
+                       for t in teams_range for s in slots_range}
+    for g in range(len(all_games)):
+        prob += pulp.lpSum(game_in_slot[g][s] for s in slots_range) == 1
+    for s in slots_range:
+        slot_capacity = courts_per_slot[s]
+        for w in weeks_range:
+            prob += pulp.lpSum(game_in_slot[g][s] for g in games_by_week[w]) <= slot_capacity[w]
+    for g, (_, possible_refs) in enumerate(game_meta):
         for s in slots_range:
-            prob += pulp.lpSum(refs[(tr, (t1,t2), w)][s] for tr in possible_refs) == game_in_slot[((t1,t2), w)][s]
-    for t_ref in all_teams:
+            # Without referee variables this keeps the game out of the slot
+            prob += pulp.lpSum(refs[(tr, g)].get(s, 0) for tr in possible_refs) == game_in_slot[g][s]
+    for t_ref in teams_range:
         for w in weeks_range:
             for s in slots_range:
-                adjacent_play = pulp.LpAffineExpression()
-                if s > 1: adjacent_play += is_playing[(t_ref, w, s - 1)]
-                if s < num_slots: adjacent_play += is_playing[(t_ref, w, s + 1)]
-                prob += is_reffing[(t_ref, w, s)] <= adjacent_play
+                # A team with no game to referee in this slot needs no constraint
+                reffing = ref_terms.get((t_ref, w, s))
+                if not reffing:
+                    continue
+                adjacent_play = play_terms.get((t_ref, w, s - 1), []) + play_terms.get((t_ref, w, s + 1), [])
+                prob += pulp.lpSum(reffing) <= pulp.lpSum(adjacent_play)
     
     # Constraint: Teams can only referee once per week (day)
-    for t_ref in all_teams:
+    for t_ref in teams_range:
         for w in weeks_range:
             # Sum of all referee assignments for this team in this week across all slots
-            prob += pulp.lpSum(is_reffing[(t_ref, w, s)] for s in slots_range) <= 1
+            prob += pulp.lpSum(v for s in slots_range for v in ref_terms[(t_ref, w, s)]) <= 1
     
     # --- Objective Function: Weighted deviation from expected slot distribution ---
     # Calculate target slot distribution based on court availability
     total_courts_per_slot = {s: sum(courts_per_slot[s]) for s in slots_range}
     total_courts = sum(total_courts_per_slot.values())
     
-    # Calculate expected games per team per slot
-    total_team_games = total_weeks  # Each team plays one game per week
+    # Calculate expected games per team per slot. Teams in even-sized levels play
+    # every week; teams in odd-sized levels have byes, so use each team's own count
+    games_per_team = defaultdict(int)
+    for pair in game_teams:
+        for t in pair:
+            games_per_team[t] += 1
     target_games_per_slot = {}
     for s in slots_range:
         slot_proportion = total_courts_per_slot[s] / total_courts
-        target_games_per_slot[s] = slot_proportion * total_team_games
+        for t in teams_range:
+            target_games_per_slot[(t, s)] = slot_proportion * games_per_team[t]
     
     # Define weights: prioritize balancing first and last slots more than middle ones
     slot_weights = {}
@@ -173,20 +476,21 @@ def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_le
         else:  # Middle slots
             slot_weights[s] = 1.0  # Lower weight for middle slots
     
-    # Calculate weighted deviations from target for each team
-    slot_deviations = []
-    for t in all_teams:
-        plays_per_slot = {s: pulp.lpSum(is_playing[t,w,s] for w in weeks_range) for s in slots_range}
+    # Calculate weighted deviations from target for each team. Objective terms
+    # are collected as (variable, coefficient) pairs and turned into a single
+    # expression at the end rather than scaling each variable into its own one.
+    objective_terms = []
+    # For linear programming, we need to handle absolute value using auxiliary variables
+    abs_deviations = pulp.LpVariable.dicts("AbsDev", (teams_range, slots_range), lowBound=0, cat='Continuous')
+    for t in teams_range:
         for s in slots_range:
             # Use weighted deviation from target
-            deviation = plays_per_slot[s] - target_games_per_slot[s]
-            # For linear programming, we need to handle absolute value using auxiliary variables
-            abs_deviation = pulp.LpVariable(f"AbsDev_{t}_{s}", lowBound=0, cat='Continuous')
+            deviation = team_slot_plays[(t, s)] - target_games_per_slot[(t, s)]
+            abs_deviation = abs_deviations[t][s]
             prob += abs_deviation >= deviation
             prob += abs_deviation >= -deviation
             # Apply weight to this slot's deviation
-            weighted_deviation = slot_weights[s] * abs_deviation
-            slot_deviations.append(weighted_deviation)
+            objective_terms.append((abs_deviation, slot_weights[s]))
     
     # Slot distribution weights handle everything - no discrete penalties needed
     
@@ -195,63 +499,59 @@ def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_le
     target_refs_per_team = total_games / len(all_teams)
 
     # Soft hard limits for referee balance (±1 from target)
-    ref_soft_hard_limits = []
-    for t in all_teams:
-        total_refs = pulp.lpSum(is_reffing[(t, w, s)] for w in weeks_range for s in slots_range)
+    ref_under_slacks = pulp.LpVariable.dicts("RefUnderSlack", teams_range, lowBound=0, cat='Continuous')
+    ref_over_slacks = pulp.LpVariable.dicts("RefOverSlack", teams_range, lowBound=0, cat='Continuous')
+    for t in teams_range:
+        total_refs = pulp.lpSum(v for w in weeks_range for s in slots_range for v in ref_terms[(t, w, s)])
         
         # Soft hard limit: team should ref between target-1 and target+1
         target_min = max(0, target_refs_per_team - 1)
         target_max = target_refs_per_team + 1
         
         # Slack variables for violations
-        under_slack = pulp.LpVariable(f"RefUnderSlack_{t}", lowBound=0, cat='Continuous')
-        over_slack = pulp.LpVariable(f"RefOverSlack_{t}", lowBound=0, cat='Continuous')
+        under_slack = ref_under_slacks[t]
+        over_slack = ref_over_slacks[t]
         
         # Constraints with slack
         prob += total_refs + under_slack >= target_min
         prob += total_refs - over_slack <= target_max
         
         # High penalties for violations
-        ref_soft_hard_limits.append(under_slack * 1000)  # 1000 points per ref under minimum
-        ref_soft_hard_limits.append(over_slack * 1000)   # 1000 points per ref over maximum
+        objective_terms.append((under_slack, 1000))  # 1000 points per ref under minimum
+        objective_terms.append((over_slack, 1000))   # 1000 points per ref over maximum
+
+    first_under_slacks = pulp.LpVariable.dicts("FirstUnderSlack", teams_range, lowBound=0, cat='Continuous')
+    first_over_slacks = pulp.LpVariable.dicts("FirstOverSlack", teams_range, lowBound=0, cat='Continuous')
+    last_under_slacks = pulp.LpVariable.dicts("LastUnderSlack", teams_range, lowBound=0, cat='Continuous')
+    last_over_slacks = pulp.LpVariable.dicts("LastOverSlack", teams_range, lowBound=0, cat='Continuous')
+    for t in teams_range:
+        # Soft hard limits for FIRST and LAST slot games per team
+        min_first_games = int(target_games_per_slot[(t, 1)])  # floor
+        max_first_games = min_first_games + 1  # floor + 1
+        min_last_games = int(target_games_per_slot[(t, num_slots)])  # floor
+        max_last_games = min_last_games + 1  # floor + 1
 
-    # Soft hard limits for FIRST slot games per team
-    expected_first_games_per_team = target_games_per_slot[1]
-    min_first_games = int(expected_first_games_per_team)  # floor
-    max_first_games = min_first_games + 1  # floor + 1
-    
-    # Soft hard limits for LAST slot games per team  
-    expected_last_games_per_team = target_games_per_slot[num_slots]
-    min_last_games = int(expected_last_games_per_team)  # floor
-    max_last_games = min_last_games + 1  # floor + 1
-    
-    first_last_soft_hard_limits = []
-    for t in all_teams:
         # FIRST slot limits
-        team_first_games = pulp.lpSum(is_playing[(t, w, 1)] for w in weeks_range)
-        first_under_slack = pulp.LpVariable(f"FirstUnderSlack_{t}", lowBound=0, cat='Continuous') 
-        first_over_slack = pulp.LpVariable(f"FirstOverSlack_{t}", lowBound=0, cat='Continuous')
+        team_first_games = team_slot_plays[(t, 1)]
+        first_under_slack = first_under_slacks[t]
+        first_over_slack = first_over_slacks[t]
         prob += team_first_games + first_under_slack >= min_first_games
         prob += team_first_games - first_over_slack <= max_first_games
-        first_last_soft_hard_limits.append(first_under_slack * 500)
-        first_last_soft_hard_limits.append(first_over_slack * 500)
+        objective_terms.append((first_under_slack, 500))
+        objective_terms.append((first_over_slack, 500))
         
         # LAST slot limits
-        team_last_games = pulp.lpSum(is_playing[(t, w, num_slots)] for w in weeks_range)
-        last_under_slack = pulp.LpVariable(f"LastUnderSlack_{t}", lowBound=0, cat='Continuous') 
-        last_over_slack = pulp.LpVariable(f"LastOverSlack_{t}", lowBound=0, cat='Continuous')
+        team_last_games = team_slot_plays[(t, num_slots)]
+        last_under_slack = last_under_slacks[t]
+        last_over_slack = last_over_slacks[t]
         prob += team_last_games + last_under_slack >= min_last_games
         prob += team_last_games - last_over_slack <= max_last_games
-        first_last_soft_hard_limits.append(last_under_slack * 500)
-        first_last_soft_hard_limits.append(last_over_slack * 500)
+        objective_terms.append((last_under_slack, 500))
+        objective_terms.append((last_over_slack, 500))
     
 
     # Combined objective: slot distribution + soft hard limits
-    total_objective = (pulp.lpSum(slot_deviations) + 
-                      pulp.lpSum(ref_soft_hard_limits) +
-                      pulp.lpSum(first_last_soft_hard_limits))
-    
-    prob.setObjective(total_objective)
+    prob.setObjective(pulp.LpAffineExpression(objective_terms))
 
     # Check for cancellation before solving
     if cancellation_checker and cancellation_checker():
@@ -264,7 +564,6 @@ def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_le
         return None, None, None
     
     # --- Solve ---
-    # Use orloge to parse solver output
     import tempfile
     import os
     import threading
@@ -276,7 +575,14 @@ def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_le
         temp_log_path = temp_log.name
     
     # Solve with cancellation support
-    solver = pulp.PULP_CBC_CMD(timeLimit=time_limit, gapRel=gapRel, logPath=temp_log_path, msg=False)
+    use_highs = solver == "highs" and pulp.HiGHS().available()
+    if solver == "highs" and not use_highs:
+        print("    -> HiGHS is not available (highspy not installed), using CBC")
+    if use_highs:
+        # HiGHS runs in-process, so it is stopped through its own API rather than a signal
+        lp_solver = TrackedHiGHS(timeLimit=time_limit, gapRel=gapRel, threads=threads, msg=False)
+    else:
+        lp_solver = TrackedCBC(timeLimit=time_limit, gapRel=gapRel, logPath=temp_log_path, msg=False, threads=threads)
     
     # Run solver in a separate thread so we can check for cancellation
     solve_result: list = [None]  # Use list to allow modification from thread
@@ -284,7 +590,7 @@ def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_le
     
     def solve_thread():
         try:
-            solve_result[0] = prob.solve(solver)
+            solve_result[0] = prob.solve(lp_solver)
         except Exception as e:
             solve_exception[0] = e
     
@@ -295,62 +601,61 @@ def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_le
     
     # Check for cancellation while solver runs
     start_time = time_module.time()
+    timed_out = False
     while thread.is_alive():
         # Check cancellation every 0.1 seconds
         thread.join(0.1)
         
-        # Check for cancellation
         if cancellation_checker and cancellation_checker():
             print("    -> Cancellation requested during solving - terminating solver")
-            # Kill any CBC processes that might be running
-            try:
-                import subprocess
-                subprocess.run(['pkill', '-f', 'cbc'], check=False, capture_output=True)
-            except:
-                pass
-            # Clean up temp file and return
-            try:
-                os.unlink(temp_log_path)
-            except:
-                pass
-            return None, None, None
-        
-        # Check for "use best" 
-        if use_best_checker and use_best_checker():
-            print("    -> Stop and use best requested during solving - terminating solver")
-            try:
-                import subprocess
-                subprocess.run(['pkill', '-f', 'cbc'], check=False, capture_output=True)
-            except:
-                pass
-            try:
-                os.unlink(temp_log_path)
-            except:
-                pass
-            return None, None, None
-        
-        # Safety timeout check
-        if time_module.time() - start_time > time_limit + 10:  # Extra 10 seconds buffer
+        elif use_best_checker and use_best_checker():
+            print("    -> Stop and use best requested during solving - stopping solver")
+            # Interrupting rather than killing lets the solver hand back the best
+            # schedule it has so far, which may beat the other blueprints'. CBC
+            # loses a SIGINT that arrives while it is still reading the model, so
+            # repeat it for a while before giving up on this blueprint.
+            deadline = time_module.time() + 5
+            while thread.is_alive() and time_module.time() < deadline:
+                lp_solver.interrupt()
+                thread.join(0.5)
+            if not thread.is_alive():
+                break
+        # Safety timeout check: CBC does not check its time limit during presolve,
+        # so kill it outright if it overruns and treat the blueprint as unsolved
+        elif time_module.time() - start_time > time_limit + 10:  # Extra 10 seconds buffer
             print("    -> Solver exceeded time limit - terminating")
-            try:
-                import subprocess
-                subprocess.run(['pkill', '-f', 'cbc'], check=False, capture_output=True)
-            except:
-                pass
-            break
+            timed_out = True
+        else:
+            continue
+
+        # Only stop this blueprint's solve, other blueprints may be solving in
+        # parallel. Keep at it until the solve returns, in case CBC had not
+        # been started yet the first time round.
+        while thread.is_alive():
+            lp_solver.kill()
+            thread.join(0.1)
+        if not use_highs:
+            lp_solver.delete_tmp_files(*lp_solver.tmp_files)
+        try:
+            os.unlink(temp_log_path)
+        except:
+            pass
+        return None, TIMED_OUT if timed_out else None, None
     
     # Wait for thread to complete and check for exceptions
     thread.join()
     if solve_exception[0]:
         raise solve_exception[0]
     
-    # Parse the log file with orloge
-    try:
-        log_info = orloge.get_info_solver(temp_log_path, 'CBC')
-        if 'best_bound' in log_info and log_info['best_bound'] is not None:
-            theoretical_best = log_info['best_bound']
-    except Exception as e:
-        print(f"Could not parse solver logs: {e}")
+    if use_highs:
+        # HiGHS reports its bound directly, no log parsing needed
+        if prob.solverModel.getInfo().mip_dual_bound > -float('inf'):
+            theoretical_best = prob.solverModel.getInfo().mip_dual_bound
+    else:
+        try:
+            theoretical_best = read_cbc_best_bound(temp_log_path)
+        except Exception as e:
+            print(f"Could not parse solver logs: {e}")
         
     # Clean up temp file
     os.unlink(temp_log_path)
@@ -360,32 +665,21 @@ def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_le
         print("    -> Cancelled after solving")
         return None, None, None
     
-    # Check for "use best" after solving
-    if use_best_checker and use_best_checker():
-        print("    -> Stop and use best requested after solving")
-        return None, None, None
-
     # --- Format Output ---
     if pulp.LpStatus[prob.status] in ["Optimal", "Feasible"] and solve_result[0] is not None:
         objective_score = prob.objective.value() if prob.objective else None
         
-        # theoretical_best is now set from orloge log parsing above
+        # Read the solution back in one pass over the variables
+        slot_of_game = {g: s for g in range(len(all_games)) for s in slots_range if game_in_slot[g][s].varValue > 0.5}
+        ref_of_game = {g: all_teams[t_ref] for (t_ref, g), ref_vars in refs.items()
+                       if slot_of_game[g] in ref_vars and ref_vars[slot_of_game[g]].varValue > 0.5}
         schedule_output = []
         for w in weeks_range:
             week_data = {"week": w + 1, "slots": {str(s): [] for s in slots_range}}
-            games_this_week = [(g, wk) for g, wk in all_games if wk == w]
-            for s in slots_range:
-                for game, week in games_this_week:
-                    if game_in_slot[(game, week)][s].varValue > 0.5:
-                        t1, t2 = game
-                        game_ref = "N/A"
-                        level = team_to_level[t1]
-                        possible_refs = [t for t in team_names_by_level[level] if t != t1 and t != t2]
-                        for t_ref in possible_refs:
-                            if refs[(t_ref, game, week)][s].varValue > 0.5:
-                                game_ref = t_ref
-                                break
-                        week_data["slots"][str(s)].append({"level": level, "teams": [t1, t2], "ref": game_ref})
+            for g in games_by_week[w]:
+                t1, t2 = all_games[g][0]
+                level, _ = game_meta[g]
+                week_data["slots"][str(slot_of_game[g])].append({"level": level, "teams": [t1, t2], "ref": ref_of_game.get(g, "N/A")})
             schedule_output.append(week_data)
         return schedule_output, objective_score, theoretical_best
     else:
@@ -394,18 +688,19 @@ def phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_le
 def flip_teams_by_round(schedule, team_names_by_level):
     if not schedule: return schedule
     rr_lengths = {level: get_round_robin_length(len(teams)) for level, teams in team_names_by_level.items()}
+    # Teams are swapped in every odd-numbered round of each level's round-robin
+    flip_by_week_level = {(week_data["week"] - 1, level): ((week_data["week"] - 1) // rr_len) % 2 == 1
+                          for week_data in schedule for level, rr_len in rr_lengths.items()}
     for week_data in schedule:
         week = week_data["week"] - 1
         for slot in week_data["slots"].values():
             for game in slot:
-                level = game["level"]
-                round_num = week // rr_lengths[level]
-                if round_num % 2 == 1:
-                    game["teams"] = [game["teams"][1], game["teams"][0]]
+                if flip_by_week_level[(week, game["level"])]:
+                    game["teams"].reverse()
     return schedule
 
 ### NEW/MODIFIED ###
-def generate_schedule(courts_per_slot, team_names_by_level, time_limit=60.0, num_blueprints_to_generate=6, gapRel=0.25, cancellation_checker=None, use_best_checker=None, progress_callback=None):
+def generate_schedule(courts_per_slot, team_names_by_level, time_limit=60.0, num_blueprints_to_generate=6, gapRel=0.25, cancellation_checker=None, use_best_checker=None, progress_callback=None, use_ilp=False, max_workers=None, solver="cbc"):
     """
     Generates a schedule by first finding multiple unique matchup blueprints,
     then running a timed optimization on each one to find the best final schedule.
@@ -414,6 +709,9 @@ def generate_schedule(courts_per_slot, team_names_by_level, time_limit=60.0, num
         cancellation_checker: Optional function that returns True if generation should be cancelled
         use_best_checker: Optional function that returns True if generation should stop and use best found
         progress_callback: Optional function to call with progress updates
+        use_ilp: If True, build the Phase 1 blueprints with the ILP instead of the circle method
+        max_workers: How many blueprints to solve at once (defaults to one per CPU core)
+        solver: MIP solver for Phase 2, "cbc" (default) or "highs" (requires highspy)
     """
 
     if not courts_per_slot:
@@ -426,7 +724,7 @@ def generate_schedule(courts_per_slot, team_names_by_level, time_limit=60.0, num
     total_weeks = len(list(courts_per_slot.values())[0])
 
     # Phase 1: Generate a list of potential blueprints
-    blueprints = phase_1_generate_multiple_matchups(total_weeks, team_names_by_level, num_blueprints_to_generate, verbose=False, cancellation_checker=cancellation_checker)
+    blueprints = phase_1_generate_multiple_matchups(total_weeks, team_names_by_level, num_blueprints_to_generate, verbose=False, cancellation_checker=cancellation_checker, use_ilp=use_ilp)
 
     if not blueprints:
         print("\nScheduling failed in Phase 1. No valid matchup blueprints could be found.")
@@ -447,99 +745,144 @@ def generate_schedule(courts_per_slot, team_names_by_level, time_limit=60.0, num
     # Track all blueprint results as a map: blueprint_number -> {score, theoretical_best}
     blueprint_results = {}
     
-    # Divide the total time limit among all the blueprints we need to test
-    time_per_run = max(1.0, time_limit / len(blueprints)) # Ensure at least 1 second per run
-    
-    for i, blueprint in enumerate(blueprints):
-        # Check for cancellation or "use best" before each blueprint
+    # Blueprints are solved in parallel. Each solve is a separate CBC process, so
+    # worker threads are enough to keep the cores busy, and unlike a process
+    # pool they can share the cancellation/use-best checkers. The total time
+    # limit is spread over the rounds of parallel solves rather than over every
+    # blueprint, so each blueprint gets more solver time in the same wall time.
+    import time as time_module
+    num_workers = max_workers or min(len(blueprints), os.cpu_count() or 1)
+    phase_2_deadline = time_module.time() + time_limit
+    # Cores not taken by a blueprint of their own go to CBC's parallel branch-and-cut
+    threads_per_solve = max(1, (os.cpu_count() or 1) // num_workers)
+
+    def stop_requested():
+        """Returns "cancel" or "use_best" once either has been requested, otherwise None."""
         if cancellation_checker and cancellation_checker():
-            print(f"\nSchedule generation cancelled during Blueprint #{i+1}.")
-            return None
-            
-        # Check for "use best" request - return best schedule found so far
+            return "cancel"
         if use_best_checker and use_best_checker():
-            if best_schedule:
-                print(f"\nSchedule generation stopped early. Using best schedule found (score: {best_score}).")
-                # Phase 3: Post-process the best schedule found so far
-                final_schedule = flip_teams_by_round(best_schedule, team_names_by_level)
-                print("Successfully generated a complete schedule!")
-                return final_schedule
-            else:
-                print(f"\nSchedule generation stopped early but no valid schedule found yet.")
-                return None
-        
-        # Update progress at start of blueprint
-        if progress_callback:
-            progress_callback({
-                'phase': 'phase_2',
-                'current_blueprint': i + 1,
-                'total_blueprints': len(blueprints),
-                'best_score': best_score if best_score != float('inf') else None,
-                'last_score': None,
-                'best_possible_score': theoretical_best_score,
-                'best_schedule': best_schedule,
-                'blueprint_results': blueprint_results
-            })
-            
-        print(f"  Optimizing for Blueprint #{i+1}/{len(blueprints)} (time limit: {time_per_run:.1f}s)...")
+            return "use_best"
+        return None
 
-        schedule, score, theoretical_best = phase_2_assign_slots_and_refs(total_weeks, courts_per_slot, team_names_by_level, blueprint, time_limit=time_per_run, gapRel=gapRel, cancellation_checker=cancellation_checker, use_best_checker=use_best_checker)
+    stop = None
 
-        if schedule and score is not None:
-            print(f"    -> Result: Feasible, Imbalance Score: {score}")
-            if theoretical_best is not None and theoretical_best > 0:
-                print(f"    -> Theoretical Best (Lower Bound): {theoretical_best}")
-            
-            # Update theoretical best score from solver logs
-            if theoretical_best is not None:
-                theoretical_best_score = theoretical_best
-            
-            # Store blueprint result
-            blueprint_results[i + 1] = {
-                'score': score,
-                'theoretical_best': theoretical_best
-            }
-            
-            # Check if this is a new best
-            if score < best_score:
-                print(f"    -> NEW BEST FOUND! (gapRel: {(score - theoretical_best_score) / theoretical_best_score if theoretical_best_score else 0})")
-                best_score = score
-                best_schedule = schedule
-            
-            # Update progress with current state (always include best_schedule and blueprint_results)
-            if progress_callback:
-                progress_callback({
-                    'phase': 'phase_2',
-                    'current_blueprint': i + 1,
-                    'total_blueprints': len(blueprints),
-                    'best_score': best_score if best_score != float('inf') else None,
-                    'last_score': score,
-                    'best_possible_score': theoretical_best_score,
-                    'best_schedule': best_schedule,
-                    'blueprint_results': blueprint_results
-                })
-        else:
-            print(f"    -> Result: Infeasible. This blueprint could not be scheduled.")
-            
-            # Store infeasible blueprint result
-            blueprint_results[i + 1] = {
-                'score': 'infeasible',
-                'theoretical_best': None
-            }
-            
-            # Update progress for infeasible result
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+        running = {}
+
+        def start_blueprint(i):
+            # Update progress at start of blueprint
             if progress_callback:
                 progress_callback({
                     'phase': 'phase_2',
                     'current_blueprint': i + 1,
                     'total_blueprints': len(blueprints),
                     'best_score': best_score if best_score != float('inf') else None,
-                    'last_score': 'infeasible',
+                    'last_score': None,
                     'best_possible_score': theoretical_best_score,
                     'best_schedule': best_schedule,
                     'blueprint_results': blueprint_results
                 })
+            # Each blueprint gets its share of the time left rather than of the
+            # total, so time saved by blueprints that stop early (infeasible, or
+            # solved within gapRel) goes to the ones still waiting
+            remaining_rounds = math.ceil((len(blueprints) - i) / num_workers)
+            time_per_run = max(1.0, (phase_2_deadline - time_module.time()) / remaining_rounds) # Ensure at least 1 second per run
+            print(f"  Optimizing for Blueprint #{i+1}/{len(blueprints)} (time limit: {time_per_run:.1f}s)...")
+            future = executor.submit(phase_2_assign_slots_and_refs, total_weeks, courts_per_slot, team_names_by_level, blueprints[i],
+                                     time_limit=time_per_run, gapRel=gapRel, cancellation_checker=cancellation_checker, use_best_checker=use_best_checker,
+                                     threads=threads_per_solve, solver=solver)
+            running[future] = i
+
+        next_blueprint = 0
+        while next_blueprint < min(num_workers, len(blueprints)):
+            start_blueprint(next_blueprint)
+            next_blueprint += 1
+
+        while running:
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                schedule, score, theoretical_best = future.result()
+
+                # A solve stopped by cancel or "use best" returns no schedule
+                # either, but that says nothing about whether it is infeasible
+                if schedule is None and stop_requested():
+                    continue
+
+                if schedule and score is not None:
+                    print(f"    -> Blueprint #{i+1} Result: Feasible, Imbalance Score: {score}")
+                    if theoretical_best is not None and theoretical_best > 0:
+                        print(f"    -> Theoretical Best (Lower Bound): {theoretical_best}")
+                    
+                    # Update theoretical best score from solver logs
+                    if theoretical_best is not None:
+                        theoretical_best_score = theoretical_best
+                    
+                    # Store blueprint result
+                    blueprint_results[i + 1] = {
+                        'score': score,
+                        'theoretical_best': theoretical_best
+                    }
+                    
+                    # Check if this is a new best
+                    if score < best_score:
+                        print(f"    -> NEW BEST FOUND! (gapRel: {(score - theoretical_best_score) / theoretical_best_score if theoretical_best_score else 0})")
+                        best_score = score
+                        best_schedule = schedule
+                    last_score = score
+                elif score == TIMED_OUT:
+                    # Killed for overrunning (e.g. stuck in presolve), which says
+                    # nothing about whether the blueprint could be scheduled
+                    print(f"    -> Blueprint #{i+1} Result: Timed out before finding a schedule.")
+                    blueprint_results[i + 1] = {
+                        'score': TIMED_OUT,
+                        'theoretical_best': None
+                    }
+                    last_score = TIMED_OUT
+                else:
+                    print(f"    -> Blueprint #{i+1} Result: Infeasible. This blueprint could not be scheduled.")
+                    
+                    # Store infeasible blueprint result
+                    blueprint_results[i + 1] = {
+                        'score': 'infeasible',
+                        'theoretical_best': None
+                    }
+                    last_score = 'infeasible'
+
+                # Update progress with current state (always include best_schedule and blueprint_results)
+                if progress_callback:
+                    progress_callback({
+                        'phase': 'phase_2',
+                        'current_blueprint': i + 1,
+                        'total_blueprints': len(blueprints),
+                        'best_score': best_score if best_score != float('inf') else None,
+                        'last_score': last_score,
+                        'best_possible_score': theoretical_best_score,
+                        'best_schedule': best_schedule,
+                        'blueprint_results': blueprint_results
+                    })
+
+            # Check for cancellation or "use best" before starting more blueprints;
+            # solves still running notice the same request and stop on their own
+            stop = stop_requested()
+            if stop == "cancel":
+                print(f"\nSchedule generation cancelled during Phase 2.")
+                return None
+            if stop == "use_best":
+                # Every running solve hands back the best schedule it has, so
+                # keep collecting them, but don't start any more blueprints
+                continue
+
+            while len(running) < num_workers and next_blueprint < len(blueprints):
+                start_blueprint(next_blueprint)
+                next_blueprint += 1
             
+    if stop == "use_best":
+        if best_schedule:
+            print(f"\nSchedule generation stopped early. Using best schedule found (score: {best_score}).")
+        else:
+            print(f"\nSchedule generation stopped early but no valid schedule found yet.")
+
     if not best_schedule:
         print("\nScheduling failed in Phase 2. None of the blueprints resulted in a valid schedule.")
         return None
@@ -548,12 +891,15 @@ def generate_schedule(courts_per_slot, team_names_by_level, time_limit=60.0, num
     
     # Print summary statistics
     print("\n=== BLUEPRINT SUMMARY STATISTICS ===")
-    feasible_scores = [result['score'] for result in blueprint_results.values() if result['score'] != 'infeasible']
+    feasible_scores = [result['score'] for result in blueprint_results.values() if result['score'] not in ('infeasible', TIMED_OUT)]
     infeasible_count = sum(1 for result in blueprint_results.values() if result['score'] == 'infeasible')
+    timed_out_count = sum(1 for result in blueprint_results.values() if result['score'] == TIMED_OUT)
     
     print(f"Total blueprints evaluated: {len(blueprint_results)}")
     print(f"Feasible blueprints: {len(feasible_scores)}")
     print(f"Infeasible blueprints: {infeasible_count}")
+    if timed_out_count:
+        print(f"Timed out blueprints: {timed_out_count}")
     
     if feasible_scores:
         avg_score = sum(feasible_scores) / len(feasible_scores)
@@ -578,7 +924,7 @@ def generate_schedule(courts_per_slot, team_names_by_level, time_limit=60.0, num
         print(f"\nTop 10 scores:")
         # Create list of (blueprint_num, score) for feasible results
         blueprint_scores = [(bp_num, result['score']) for bp_num, result in blueprint_results.items() 
-                           if result['score'] != 'infeasible']
+                           if result['score'] not in ('infeasible', TIMED_OUT)]
         # Sort by score (best first)
         blueprint_scores.sort(key=lambda x: x[1])
         
@@ -0,0 +1,34 @@
+import os
+
+from django.test import SimpleTestCase
+
+from schedule import read_cbc_best_bound
+
+# Ends of real CBC logs, one per way a Phase 2 solve can finish
+LOG_DIR = os.path.join(os.path.dirname(__file__), 'cbc_logs')
+
+
+def best_bound(name):
+    return read_cbc_best_bound(os.path.join(LOG_DIR, name))
+
+
+class ReadCbcBestBoundTests(SimpleTestCase):
+    def test_optimal_uses_the_objective_value(self):
+        self.assertEqual(best_bound('optimal.log'), 9.5)
+
+    def test_within_gap_tolerance_uses_the_objective_value(self):
+        self.assertAlmostEqual(best_bound('gap_tolerance.log'), 1709.77777778)
+
+    def test_time_limit_uses_the_lower_bound(self):
+        self.assertAlmostEqual(best_bound('time_limit.log'), 67.556)
+
+    def test_interrupted_uses_the_lower_bound(self):
+        # "Use best" stops CBC with SIGINT
+        self.assertEqual(best_bound('ctrl_c.log'), 0.0)
+
+    def test_proven_infeasible_has_no_bound(self):
+        self.assertIsNone(best_bound('infeasible.log'))
+
+    def test_log_without_result_has_no_bound(self):
+        # Presolve finds the infeasibility, so CBC never prints a result summary
+        self.assertIsNone(best_bound('presolve_infeasible.log'))
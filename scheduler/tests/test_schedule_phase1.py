@@ -0,0 +1,178 @@
+import contextlib
+import io
+import itertools
+from collections import Counter
+
+from django.test import SimpleTestCase
+
+from schedule import (blueprint_signature, circle_method_rounds, get_round_robin_length, phase_1_generate_matchups_circle,
+                      phase_1_generate_multiple_matchups)
+from tests import cycle_pairing_test, pairing_tests
+
+
+def make_teams(sizes):
+    """Builds team_names_by_level from a {level: number of teams} dict."""
+    return {level: [f"Team{level}{i + 1}" for i in range(size)] for level, size in sizes.items()}
+
+
+def generate_blueprints(total_weeks, team_names_by_level, num_blueprints=3):
+    # Phase 1 reports progress on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        return phase_1_generate_matchups_circle(total_weeks, team_names_by_level, num_blueprints)
+
+
+def blueprint_to_schedule(blueprint, team_names_by_level):
+    """Puts a blueprint into the formatted schedule shape the checks in tests.py expect."""
+    team_to_level = {team: level for level, teams in team_names_by_level.items() for team in teams}
+    return [
+        {
+            "week": week["week"] + 1,
+            "slots": {"1": [{"level": team_to_level[t1], "teams": [t1, t2], "ref": "N/A"}
+                            for t1, t2 in week["games"]]},
+        }
+        for week in blueprint
+    ]
+
+
+class CircleMethodRoundsTests(SimpleTestCase):
+    def assert_full_round_robin(self, teams, rounds):
+        self.assertEqual(len(rounds), get_round_robin_length(len(teams)))
+        pair_counts = Counter(pair for pairs in rounds for pair in pairs)
+        expected_pairs = {tuple(sorted(pair)) for pair in itertools.combinations(teams, 2)}
+        self.assertEqual(set(pair_counts), expected_pairs)
+        self.assertTrue(all(count == 1 for count in pair_counts.values()))
+
+    def test_even_level_plays_everyone_every_round(self):
+        teams = make_teams({"A": 6})["A"]
+        rounds = circle_method_rounds(teams)
+        self.assert_full_round_robin(teams, rounds)
+        for pairs in rounds:
+            self.assertCountEqual([team for pair in pairs for team in pair], teams)
+
+    def test_odd_level_gives_each_team_one_bye(self):
+        teams = make_teams({"A": 5})["A"]
+        rounds = circle_method_rounds(teams)
+        self.assert_full_round_robin(teams, rounds)
+        byes = Counter()
+        for pairs in rounds:
+            playing = [team for pair in pairs for team in pair]
+            self.assertEqual(len(playing), len(set(playing)))
+            byes.update(set(teams) - set(playing))
+        self.assertEqual(byes, Counter(teams))
+
+    def test_single_team_level_has_no_games(self):
+        self.assertEqual(circle_method_rounds(["TeamA1"]), [[]])
+
+
+class BlueprintSignatureTests(SimpleTestCase):
+    def blueprint_from_rounds(self, rounds_by_level, names=None):
+        """Builds a blueprint from each level's rounds, optionally renaming teams through names."""
+        names = names or {}
+        num_weeks = max(len(rounds) for rounds in rounds_by_level.values())
+        return [
+            {"week": w, "games": [tuple(sorted((names.get(t1, t1), names.get(t2, t2))))
+                                  for rounds in rounds_by_level.values() for t1, t2 in rounds[w]]}
+            for w in range(num_weeks)
+        ]
+
+    def test_renamed_teams_give_the_same_signature(self):
+        teams = make_teams({"A": 6, "B": 5})
+        rounds_by_level = {level: circle_method_rounds(level_teams) for level, level_teams in teams.items()}
+        # Rename the teams within each level
+        names = {}
+        for level_teams in teams.values():
+            names.update(zip(level_teams, reversed(level_teams)))
+        blueprint = self.blueprint_from_rounds(rounds_by_level)
+        renamed = self.blueprint_from_rounds(rounds_by_level, names)
+        self.assertNotEqual(blueprint, renamed)
+        self.assertEqual(blueprint_signature(blueprint, teams), blueprint_signature(renamed, teams))
+
+    def test_different_round_robin_structure_gives_a_different_signature(self):
+        teams = make_teams({"A": 8})
+        t = teams["A"]
+        # The circle method pairs up every two rounds into a single 8-cycle. This
+        # round-robin plays two groups of four first, so its first rounds pair up
+        # into two 4-cycles and no renaming can turn one into the other.
+        groups = [[(0, 1), (2, 3)], [(0, 2), (1, 3)], [(0, 3), (1, 2)]]
+        rounds = [[(t[a], t[b]) for a, b in pairs] + [(t[a + 4], t[b + 4]) for a, b in pairs] for pairs in groups]
+        rounds += [[(t[i], t[4 + (i + k) % 4]) for i in range(4)] for k in range(4)]
+        circle = self.blueprint_from_rounds({"A": circle_method_rounds(t)})
+        grouped = self.blueprint_from_rounds({"A": rounds})
+        self.assertNotEqual(blueprint_signature(circle, teams), blueprint_signature(grouped, teams))
+
+
+class CircleBlueprintTests(SimpleTestCase):
+    def assert_valid_blueprints(self, total_weeks, team_names_by_level, blueprints):
+        self.assertTrue(blueprints)
+        team_to_level = {team: level for level, teams in team_names_by_level.items() for team in teams}
+        for blueprint in blueprints:
+            self.assertEqual([week["week"] for week in blueprint], list(range(total_weeks)))
+            for week in blueprint:
+                playing = [team for pair in week["games"] for team in pair]
+                self.assertEqual(len(playing), len(set(playing)))
+                for t1, t2 in week["games"]:
+                    self.assertEqual(team_to_level[t1], team_to_level[t2])
+
+            for level, teams in team_names_by_level.items():
+                num_teams = len(teams)
+                if num_teams < 2:
+                    continue
+                level_pairs = [tuple(sorted(pair)) for pair in itertools.combinations(teams, 2)]
+                pair_counts = Counter(pair for week in blueprint for pair in week["games"] if pair[0] in teams)
+                # One team sits out each week in an odd level
+                total_level_games = (num_teams // 2) * total_weeks
+                min_plays = total_level_games // len(level_pairs)
+                for pair in level_pairs:
+                    self.assertIn(pair_counts[pair], (min_plays, min_plays + 1), f"{pair} in level {level}")
+
+            schedule = blueprint_to_schedule(blueprint, team_names_by_level)
+            passed, errors = pairing_tests(schedule, team_names_by_level)
+            self.assertTrue(passed, errors)
+            passed, errors = cycle_pairing_test(schedule, team_names_by_level)
+            self.assertTrue(passed, errors)
+
+    def test_even_levels(self):
+        teams = make_teams({"A": 6, "B": 6, "C": 6})
+        self.assert_valid_blueprints(10, teams, generate_blueprints(10, teams))
+
+    def test_odd_and_even_levels(self):
+        teams = make_teams({"A": 5, "B": 8})
+        blueprints = generate_blueprints(9, teams)
+        self.assert_valid_blueprints(9, teams, blueprints)
+        # Each team in the 5-team level sits out once per round-robin
+        for blueprint in blueprints:
+            byes = Counter()
+            for week in blueprint[:5]:
+                playing = {team for pair in week["games"] for team in pair}
+                byes.update(team for team in teams["A"] if team not in playing)
+            self.assertEqual(byes, Counter(teams["A"]))
+
+    def test_single_team_level(self):
+        teams = make_teams({"A": 1, "B": 4})
+        blueprints = generate_blueprints(6, teams)
+        self.assert_valid_blueprints(6, teams, blueprints)
+        for blueprint in blueprints:
+            self.assertFalse([pair for week in blueprint for pair in week["games"] if "TeamA1" in pair])
+
+    def test_season_not_a_multiple_of_the_round_robin(self):
+        # 8 weeks of a 5-week round-robin: some pairs meet twice, the rest once
+        teams = make_teams({"A": 6, "B": 5})
+        self.assert_valid_blueprints(8, teams, generate_blueprints(8, teams))
+
+    def test_blueprints_are_distinct(self):
+        teams = make_teams({"A": 6, "B": 8})
+        blueprints = generate_blueprints(10, teams, num_blueprints=4)
+        self.assertEqual(len(blueprints), 4)
+        keys = {tuple(tuple(week["games"]) for week in blueprint) for blueprint in blueprints}
+        self.assertEqual(len(keys), 4)
+
+    def test_ilp_fallback_fills_up_small_levels(self):
+        # Pinning week 0 leaves a 4-team level only two round orders, so the
+        # rest must come from relabelled blueprints
+        teams = make_teams({"A": 4})
+        with contextlib.redirect_stdout(io.StringIO()):
+            blueprints = phase_1_generate_multiple_matchups(6, teams, 4, use_ilp=True)
+        self.assertEqual(len(blueprints), 4)
+        self.assert_valid_blueprints(6, teams, blueprints)
+        keys = {tuple(tuple(week["games"]) for week in blueprint) for blueprint in blueprints}
+        self.assertEqual(len(keys), 4)